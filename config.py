@@ -1,5 +1,4 @@
 
-import inspect
 from inspect import isclass
 from typing import *
 import collections.abc
@@ -24,6 +23,33 @@ setting_specs = dict(
 all_settings = list(setting_specs.keys())
 
 
+def make_setting_validator(key, spec):
+    '''
+    Returns a function that checks if a value is valid for the setting with
+    the given name and spec (it raises an exception if its not)
+    '''
+    if isclass(spec):
+        def validate(value):
+            if not isinstance(value, spec):
+                raise TypeError('{} setting must be a {} value'.format(key, spec.__name__))
+
+    elif isinstance(spec, (list, tuple)):
+        spec = tuple(spec)
+        def validate(value):
+            if value not in spec:
+                raise ValueError('{} setting must be one of this values: {}'.format(key, ', '.join(map(str, spec))))
+
+    else:
+        def validate(value):
+            pass
+
+    return validate
+
+
+# Validators for each setting value (built once from the setting specs)
+setting_validators = dict((key, make_setting_validator(key, spec)) for key, spec in setting_specs.items())
+
+
 # Default values for each setting
 default_settings = dict(
     enabled=__debug__, # Only activate validation when debugging
@@ -42,62 +68,53 @@ default_settings = dict(
 class Settings(collections.abc.MutableMapping):
     '''
     Objects of this class are used to store setting values.
+    They implement the mutable mapping interface (keys are setting names)
     '''
+    __slots__ = ('_entries',)
+
     def __init__(self, **kwargs):
-        self._entries = {}
+        # Entries hold the value of every setting (defaults are merged in
+        # eagerly, so reading a setting is a single dict lookup)
+        self._entries = dict(default_settings)
         self.update(kwargs)
 
 
     def __delitem__(self, key):
+        # Unset the entry (the setting returns back to its default value)
         try:
-            del self._entries[key]
+            self._entries[key] = default_settings[key]
         except KeyError:
             pass
 
     def __getitem__(self, key):
         try:
-            if key not in self._entries:
-                return default_settings[key]
             return self._entries[key]
         except KeyError:
             raise KeyError('setting {} not found'.format(key))
 
     def __setitem__(self, key, value):
-        if key not in all_settings:
+        try:
+            validate = setting_validators[key]
+        except KeyError:
             raise KeyError('{} is not a valid setting'.format(key))
 
-        spec = setting_specs[key]
-        if isclass(spec) and not isinstance(value, spec):
-            raise TypeError('{} setting must be a {} value'.format(key, spec.__name__))
-
-        if isinstance(spec, (list, tuple)) and value not in spec:
-            raise ValueError('{} setting must be one of this values: {}'.format(key, ', '.join(map(str, spec))))
-
+        validate(value)
         self._entries[key] = value
 
 
-    def __getattribute__(self, key):
-        try:
-            return object.__getattribute__(self, key)
-        except AttributeError:
-            try:
-                return self.__getitem__(key)
-            except KeyError as e:
-                raise AttributeError(*e.args)
-
+    def __getattr__(self, key):
+        # Only invoked when the attribute is not found (setting values are
+        # accessed through the properties defined below the class)
+        raise AttributeError('setting {} not found'.format(key))
 
     def __setattr__(self, key, value):
-        if key.startswith('_'):
-            object.__setattr__(self, key, value)
-        else:
-            try:
-                self.__setitem__(key, value)
-            except KeyError as e:
-                raise AttributeError(*e.args)
+        if not key.startswith('_') and key not in setting_validators:
+            raise AttributeError('{} is not a valid setting'.format(key))
+        object.__setattr__(self, key, value)
 
 
-    def clear(self):
-        self._entries.clear()
+    def __contains__(self, key):
+        return key in setting_validators
 
     def __iter__(self):
         return iter(all_settings)
@@ -105,11 +122,28 @@ class Settings(collections.abc.MutableMapping):
     def __len__(self):
         return len(all_settings)
 
+
+    def update(self, *args, **kwargs):
+        entries = dict(*args, **kwargs)
+
+        # Check all the values before modifying any setting
+        for key, value in entries.items():
+            try:
+                validate = setting_validators[key]
+            except KeyError:
+                raise KeyError('{} is not a valid setting'.format(key))
+            validate(value)
+
+        self._entries.update(entries)
+
+    def clear(self):
+        self._entries.update(default_settings)
+
     def __str__(self):
-        return str(dict(self.items()))
+        return str(self._entries)
 
     def __repr__(self):
-        return repr(dict(self.items()))
+        return repr(self._entries)
 
     def copy(self):
         other = Settings()
@@ -117,5 +151,29 @@ class Settings(collections.abc.MutableMapping):
         return other
 
 
+
+def setting_property(key):
+    '''
+    Returns a property to get, set or unset the value of the given setting as
+    an attribute of a Settings object
+    '''
+    def fget(self):
+        return self._entries[key]
+
+    def fset(self, value):
+        self[key] = value
+
+    def fdel(self):
+        del self[key]
+
+    return property(fget, fset, fdel)
+
+
+# Settings can also be accessed as attributes (e.g: settings.enabled)
+for key in all_settings:
+    setattr(Settings, key, setting_property(key))
+del key
+
+
 # Global settings
 settings = Settings()
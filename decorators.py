@@ -1,7 +1,7 @@
 
 
 from typing import *
-from functools import lru_cache
+from types import FunctionType
 from config import settings, Settings
 from wrappers import ValidateFuncWrapper
 
@@ -32,9 +32,11 @@ class checked:
     def __init__(self, *args, **kwargs):
         self.func = args[0] if len(args) == 1 and callable(args[0]) else None
 
+        # Settings passed to the decorator override the global ones. The global settings
+        # are copied here, so later changes dont affect the decorated function
+        Settings(**kwargs) # Raises an exception if any of the settings is not valid
         self.options = dict(settings)
-        if self.func is None:
-            self.options.update(Settings(**kwargs))
+        self.options.update(kwargs)
 
 
     def __call__(self, *args, **kwargs):
@@ -50,12 +52,20 @@ class checked:
         return self._wrapper.__get__(obj, objtype)
 
     def __getattribute__(self, key):
-        try:
-            if not key in ['__doc__']:
-                return object.__getattribute__(self, key)
-            raise AttributeError()
-        except:
-            return getattr(object.__getattribute__(self, '_wrapper'), key)
+        if key == '__doc__':
+            return self._wrapper.__doc__
+        return object.__getattribute__(self, key)
+
+    def __getattr__(self, key):
+        if key == '_wrapper':
+            # The wrapper is built the first time its needed
+            if object.__getattribute__(self, 'func') is None:
+                raise AttributeError(key)
+            wrapper = self._wrapper = self._build_wrapper()
+            return wrapper
+
+        # Attributes not defined on the decorator are taken from the wrapper
+        return getattr(self._wrapper, key)
 
     def __str__(self):
         return str(self._wrapper)
@@ -64,14 +74,23 @@ class checked:
         return repr(self._wrapper)
 
 
-    @property
-    @lru_cache(maxsize=1)
-    def _wrapper(self):
+    def _build_wrapper(self):
+        '''
+        Builds the wrapper for the decorated function. It is called only once,
+        the first time the attribute '_wrapper' is accessed (when the decorated
+        function is called or any of its attributes is read), and the result is
+        stored in that attribute
+        '''
         assert self.func is not None
 
         # If validation is disabled, just return the function undecorated
         if not self.options['enabled']:
             return self.func
 
+        # Same if the function has no annotations and the 'self' argument of
+        # methods is not checked (there is nothing to validate)
+        if isinstance(self.func, FunctionType) and not self.func.__annotations__ and not self.options['match_self']:
+            return self.func
+
         # Decorate function and return wrapper
         return ValidateFuncWrapper(self.func, self.options)
@@ -33,24 +33,37 @@ class ValidationError(Exception):
 
     def __init__(self, func: Optional[str]=None, param: Optional[str]=None,
     expected: Optional[str]=None, got: Optional[str]=None, details: Optional[str]=None, message: Optional[str]=None) -> None:
-
-        if message is None:
-            assert got is None or expected is not None
-
-            s = param if param is not None else '?'
-            if expected is None and got is None:
-                s += ' is not valid'
-            else:
-                if expected is not None:
-                    s += ' must be ' + expected
+        assert message is not None or got is None or expected is not None
+
+        super().__init__(func, param, expected, got, details, message)
+        # The message is only formatted when its needed (many validation errors are
+        # catched and replaced by others before they are displayed)
+        self.func, self.param, self.expected, self.got, self.details, self.message = \
+            func, param, expected, got, details, message
+        self._str = None
+
+
+    def __str__(self):
+        if self._str is None:
+            param, expected, got, details, message = self.param, self.expected, self.got, self.details, self.message
+
+            if message is None:
+                parts = [param if param is not None else '?']
+                if expected is None:
+                    parts.append(' is not valid')
+                else:
+                    parts += (' must be ', expected)
                     if got is not None:
-                        s += ' but got ' + got + ' instead'
+                        parts += (' but got ', got, ' instead')
 
-            if details is not None:
-                s += ': ' + details
-        else:
-            s = message
+                if details is not None:
+                    parts += (': ', details)
+            else:
+                parts = [message]
 
-        s += ' (at function ' + (func if func is not None else '?') + ')'
+            parts += (' (at function ', self.func if self.func is not None else '?', ')')
+            self._str = ''.join(parts)
+        return self._str
 
-        super().__init__(s)
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, str(self))
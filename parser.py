@@ -4,79 +4,103 @@ import typing
 import collections.abc
 from typing import *
 from inspect import isclass
-from functools import partial
+from functools import lru_cache
 from config import settings
 from validators import *
 
 
+# These validators have no state, so the same instances are returned every time
+# they are needed
+NONE_VALIDATOR = NoneValidator()
+ANY_VALIDATOR = AnyValidator()
+TRUE_VALIDATOR = TrueValidator()
+FALSE_VALIDATOR = FalseValidator()
+
+
 def parse_annotation(x, options: Mapping[str, Any]=None) -> Validator:
     '''
     Transform type annotation to validator
     '''
     if options is None:
-        options = dict(settings)
+        options = settings
+
+    # Only these settings affect the parsing result
+    return _parse(x, options['ignore_subclasses'], options['match_compatible_classes'])
+
+
+
+def _parse(x, ignore_subclasses: bool, match_compatible_classes: bool) -> Validator:
+    '''
+    Same as parse_annotation() but takes the only settings that are needed to
+    parse the annotation. The result is cached when possible
+    '''
+    if not isinstance(x, collections.abc.Hashable) and isinstance(x, collections.abc.Iterable):
+        # Unhashable iterables (e.g. a list of types) are parsed as tuples, so that
+        # they can be cached too
+        x = tuple(x)
+
+    if isinstance(x, tuple) and len(x) > 0 and all(map(isclass, x)):
+        # The order of a list of types doesnt matter, so [int, float] and [float, int]
+        # share the same cached validator
+        x = frozenset(x)
+
+    try:
+        hash(x)
+    except TypeError:
+        # Unhashable annotation, cant be cached
+        return _parse_annotation(x, ignore_subclasses, match_compatible_classes)
+    return _parse_annotation_cached(x, ignore_subclasses, match_compatible_classes)
+
+
 
+def _parse_annotation(x, ignore_subclasses: bool, match_compatible_classes: bool) -> Validator:
+    '''
+    Does the actual work of parse_annotation() (the result is not cached)
+    '''
 
-    # None validator
-    if x in (None, type(None)) or (isinstance(x, collections.abc.Iterable) and (tuple(x) == (None) or tuple(x) == (type(None)))):
-        return NoneValidator()
+    # None validator (lists of types are parsed as tuples or frozensets, see _parse())
+    if x is None or x is type(None) or (isinstance(x, (tuple, frozenset)) and x in ((None,), (type(None),), frozenset([type(None)]))):
+        return NONE_VALIDATOR
 
     # Any validator if 'Any', ... or Optional (without args) specified
     if x is Any or x is Ellipsis or x is Optional:
-        return AnyValidator()
+        return ANY_VALIDATOR
 
     # Truth testing validators
     if x is True:
-        return TrueValidator()
+        return TRUE_VALIDATOR
     if x is False:
-        return FalseValidator()
+        return FALSE_VALIDATOR
 
     # Validator instances
     if isinstance(x, Validator):
         return x
 
-    # collections.abc classes
-    if hasattr(x, '__module__') and x.__module__ == 'collections.abc':
-        try:
-            return parse_annotation({
-                collections.abc.Iterator: Iterator,
-                collections.abc.Iterable: Iterable,
-                collections.abc.Callable: Callable
-            }.get(x), options)
-        except KeyError:
-            raise NotImplementedError()
-
-    # typing module objects
-    if hasattr(x, '__module__') and x.__module__ == 'typing':
-        kind = x.__origin__ if hasattr(x, '__origin__') and x.__origin__ is not None else x
-        args = tuple(filter(lambda arg: not isinstance(arg, typing.TypeVar), x.__args__)) if hasattr(x, '__args__') and x.__args__ is not None else ()
-
-        # Parse each arg specified on the type hint
-        args = tuple(map(partial(parse_annotation, options=options), args))
-
-        # Iterator
-        if kind == Iterator:
-            return IteratorValidator(args)
+    # Module where the annotation is defined (None if its not available)
+    module = getattr(x, '__module__', None)
 
-        # Iterable
-        if kind == Iterable:
-            return IterableValidator(args)
+    # Type hints (typing module objects and collections.abc classes)
+    if module in ('typing', 'collections.abc'):
+        kind = getattr(x, '__origin__', None)
+        if kind is None:
+            kind = x
 
-        # Callable
-        if kind == Callable:
-            return CallableValidator(args)
+        if kind in TYPE_HINT_VALIDATORS:
+            # Parse each arg specified on the type hint (TypeVars are ignored)
+            args = tuple(
+                _parse(arg, ignore_subclasses, match_compatible_classes)
+                for arg in getattr(x, '__args__', None) or ()
+                if not isinstance(arg, typing.TypeVar)
+            )
 
-        # Union
-        if kind == Union:
-            # Optional
-            if len(args) == 2 and isinstance(args[-1], NoneValidator):
-                return OptionalValidator(args[:1])
+            return TYPE_HINT_VALIDATORS[kind](args)
 
-            return AnyValidator()
+        if module == 'typing':
+            # TODO
+            # ...
+            raise NotImplementedError()
 
-        # TODO
-        # ...
-        raise NotImplementedError()
+        # Other collections.abc classes are validated as regular types
 
     if isclass(x):
         # Validator subclass
@@ -84,15 +108,47 @@ def parse_annotation(x, options: Mapping[str, Any]=None) -> Validator:
             return x()
 
         # Regular type validator
-        return TypeValidator([x], check_subclasses=not options['ignore_subclasses'], check_compatible_classes=options['match_compatible_classes'])
+        return TypeValidator([x], check_subclasses=not ignore_subclasses, check_compatible_classes=match_compatible_classes)
 
     if isinstance(x, collections.abc.Iterable) and all(map(isclass, x)):
         # Type validator but multiple types indicated
-        return TypeValidator(x, check_subclasses=not options['ignore_subclasses'], check_compatible_classes=options['match_compatible_classes'])
+        return TypeValidator(x, check_subclasses=not ignore_subclasses, check_compatible_classes=match_compatible_classes)
 
     if callable(x):
         # User validator
         return UserValidator(x)
 
     # Default validator
-    return AnyValidator()
+    return ANY_VALIDATOR
+
+
+
+def parse_union(args):
+    '''
+    Returns the validator for the type hint Union[...] given the validators of its args
+    '''
+    # Optional
+    if len(args) == 2 and isinstance(args[-1], NoneValidator):
+        return OptionalValidator(args[:1])
+
+    return ANY_VALIDATOR
+
+
+# Functions that build the validator for each kind of type hint (they take the
+# validators of the type hint args). Both the typing objects and the collections.abc
+# classes are used as keys (the later are the origin of the first ones in newer versions
+# of python)
+TYPE_HINT_VALIDATORS = {
+    Iterator: IteratorValidator,
+    collections.abc.Iterator: IteratorValidator,
+    Iterable: IterableValidator,
+    collections.abc.Iterable: IterableValidator,
+    Callable: CallableValidator,
+    collections.abc.Callable: CallableValidator,
+    Union: parse_union
+}
+
+
+# Annotations are usually shared by many functions (int, str, Iterable[int], ...),
+# so the validators built for them are cached
+_parse_annotation_cached = lru_cache(maxsize=1024, typed=True)(_parse_annotation)
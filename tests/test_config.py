@@ -2,12 +2,9 @@
 
 import unittest
 from unittest import TestCase
-from errors import *
-from itertools import *
-from inspect import *
-from typing import *
 
-from config import settings, default_settings, all_settings, setting_specs
+from collections.abc import MutableMapping
+from config import Settings, settings, default_settings, all_settings, setting_specs
 
 
 class TestConfig(TestCase):
@@ -44,7 +41,7 @@ class TestConfig(TestCase):
         # Trying to change or access an invalid setting raises an error
         self.assertRaises(AttributeError, settings.__getattribute__, 'foo')
         self.assertRaises(KeyError, settings.__getitem__, 'foo')
-        self.assertRaises(AttributeError, settings.__setattr__, 'foo', True)
+        self.assertRaisesRegex(AttributeError, 'foo is not a valid setting', settings.__setattr__, 'foo', True)
         self.assertRaises(KeyError, settings.__setitem__, 'foo', True)
 
         # Try to modify a setting with an invalid value
@@ -98,6 +95,14 @@ class TestConfig(TestCase):
         self.assertNotEqual(other, settings)
         self.assertEqual(settings.enabled, default_settings['enabled'])
 
+        # Other mutable mapping methods (pop() returns the setting to its default value)
+        self.assertIsInstance(settings, MutableMapping)
+        other = Settings()
+        self.assertEqual(other.setdefault('match_return'), default_settings['match_return'])
+        other.match_return = not default_settings['match_return']
+        self.assertEqual(other.pop('match_return'), not default_settings['match_return'])
+        self.assertEqual(other.match_return, default_settings['match_return'])
+
 
         
     def test_settings_debug(self):
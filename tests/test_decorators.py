@@ -1,14 +1,10 @@
 
 import unittest
+import weakref
 from unittest import TestCase
-from validators import *
-from errors import *
-from itertools import *
-from inspect import *
-from types import new_class
-from typing import *
-import collections.abc
+from errors import ValidationError
 from decorators import checked
+from config import settings
 
 
 class TestDecorators(TestCase):
@@ -72,14 +68,14 @@ class TestDecorators(TestCase):
         '''
         @checked
         def foo(*args):
-            for k, arg in zip(count(), args):
+            for k, arg in enumerate(args):
                 self.assertEqual(k, arg)
 
         @checked
         def bar(x, y, *args):
             self.assertEqual(x, 0)
             self.assertEqual(y, 1)
-            for k, arg in zip(count(2), args):
+            for k, arg in enumerate(args, 2):
                 self.assertEqual(k, arg)
 
         @checked
@@ -255,5 +251,153 @@ class TestDecorators(TestCase):
         self.assertRegex(Foo.baz.__qualname__, 'Foo.baz$')
 
 
+    def test_wrapped_func_param_kinds(self):
+        '''
+        Arguments are validated for all kinds of parameters: positional only, with default
+        values, *args, keyword only and **kwargs
+        '''
+        @checked
+        def foo(a : int, /, b : int = 1, *args : int, c : int, d : int = 2, **kwargs : int) -> tuple:
+            return a, b, args, c, d, kwargs
+
+        self.assertEqual(foo(0, c=3), (0, 1, (), 3, 2, {}))
+        self.assertEqual(foo(0, 5, 6, 7, c=3, d=4, e=8), (0, 5, (6, 7), 3, 4, {'e': 8}))
+        self.assertRaises(TypeError, foo, a=0, c=3)
+        self.assertRaises(TypeError, foo, 0)
+
+        for args, kwargs in [
+            (('a',), {'c': 3}), ((0, 'b'), {'c': 3}), ((0, 1, 'x'), {'c': 3}),
+            ((0,), {'c': 'c'}), ((0,), {'c': 3, 'd': 'd'}), ((0,), {'c': 3, 'e': 'e'})]:
+            self.assertRaises(ValidationError, foo, *args, **kwargs)
+
+
+    def test_wrapped_func_name_collision(self):
+        '''
+        Functions and parameters can have any name (even the names used internally
+        by the generated wrapper)
+        '''
+        @checked
+        def _checked_v0(a : int) -> int:
+            return a
+
+        @checked
+        def _checked_wrapper(_checked_func : int, _checked_c0 : int=0) -> int:
+            return _checked_func + _checked_c0
+
+        self.assertEqual(_checked_v0(1), 1)
+        self.assertEqual(_checked_v0.__name__, '_checked_v0')
+        self.assertRaises(ValidationError, _checked_v0, 'a')
+        self.assertEqual(_checked_wrapper(1, _checked_c0=2), 3)
+        self.assertRaises(ValidationError, _checked_wrapper, 1, 'a')
+
+
+    def test_decorated_func_attributes(self):
+        '''
+        Decorated functions can be weak referenced and accept new attributes
+        (like regular functions)
+        '''
+        @checked
+        def foo(x: int):
+            return x
+
+        ref = weakref.ref(foo)
+        self.assertIs(ref(), foo)
+
+        foo.custom = 1
+        self.assertEqual(foo.custom, 1)
+        self.assertEqual(foo(2), 2)
+
+
+    def test_decorated_func_lazy_wrapper(self):
+        '''
+        The wrapper of the decorated function is only built when its needed
+        '''
+        @checked
+        def foo(x: int):
+            return x
+
+        self.assertNotIn('_wrapper', vars(foo))
+        self.assertEqual(foo(1), 1)
+        self.assertIn('_wrapper', vars(foo))
+
+        @checked
+        def bar(x: int):
+            return x
+
+        self.assertEqual(bar.__name__, 'bar')
+        self.assertIn('_wrapper', vars(bar))
+
+
+    def test_decorated_method_info(self):
+        '''
+        Decorated methods have the same __module__ and __doc__ as the wrapped function
+        '''
+        class Foo:
+            @checked
+            def bar(self, x : int):
+                '''bar docstring'''
+
+        for method in (Foo.bar, Foo().bar):
+            self.assertEqual(method.__module__, __name__)
+            self.assertEqual(method.__doc__, 'bar docstring')
+
+
+    def test_decorator_disabled(self):
+        '''
+        If validation is disabled or there is nothing to validate, the decorator returns
+        the function undecorated
+        '''
+        def foo(x : int) -> int:
+            return x
+
+        def bar(x):
+            return x
+
+        self.assertIs(checked(enabled=False)(foo), foo)
+        self.assertEqual(checked(enabled=False)(foo)('hello'), 'hello')
+        self.assertIs(checked(match_self=False)(bar), bar)
+
+    def test_decorator_settings(self):
+        '''
+        Settings passed to the decorator only override the indicated global settings
+        '''
+        settings.match_return = False
+        try:
+            @checked(match_args=True)
+            def foo(x : int) -> int:
+                return str(x)
+
+            self.assertEqual(foo(1), '1')
+            self.assertRaises(ValidationError, foo, 'a')
+        finally:
+            del settings.match_return
+
+
+    def test_decorator_settings_snapshot(self):
+        '''
+        Global settings are taken when the function is decorated. Changing them
+        before the first call has no effect on the decorated function
+        '''
+        @checked
+        def foo(x : int) -> int:
+            return x
+
+        settings.match_args = False
+        try:
+            self.assertRaises(ValidationError, foo, 'a')
+        finally:
+            del settings.match_args
+        self.assertRaises(ValidationError, foo, 'a')
+
+        settings.match_args = False
+        try:
+            @checked
+            def bar(x : int):
+                return x
+        finally:
+            del settings.match_args
+        self.assertEqual(bar('a'), 'a')
+
+
 if __name__ == '__main__':
     unittest.main()
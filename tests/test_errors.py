@@ -2,10 +2,11 @@
 
 import unittest
 from unittest import TestCase
-from itertools import *
-from inspect import *
-from typing import *
-from errors import *
+import re
+from itertools import product
+from copy import copy
+import pickle
+from errors import ValidationError
 
 
 # Helper method to build validation error messages (Using ValidationError class)
@@ -18,6 +19,12 @@ funcs = ['foo', 'bar', 'qux']
 # Set of random names for function parameters
 params = ['a', 'b', 'c', 'x', 'y', 'z', '_in']
 
+# Patterns that error messages must match (compiled only once). They match line by line,
+# so that many messages can be checked at once
+GENERIC_MESSAGE = re.compile(r'^\w+ is not valid \(at function \w+\)$', re.MULTILINE)
+EXPECTED_VALUE_MESSAGE = re.compile(r'^\w+ must be float \(at function \w+\)$', re.MULTILINE)
+EXPECTED_GOT_VALUE_MESSAGE = re.compile(r'^\w+ must be float but got int instead \(at function \w+\)$', re.MULTILINE)
+
 
 class TestErrors(TestCase):
     # The next tests check error messages are formatted correctly
@@ -42,9 +49,8 @@ class TestErrors(TestCase):
         are correct
         '''
 
-        for func, param in product(funcs, params):
-            msg = build_error_message(func=func, param=param)
-            self.assertRegex(msg, '^\w+ is not valid \(at function \w+\)$')
+        msgs = [build_error_message(func=func, param=param) for func, param in product(funcs, params)]
+        self.assertEqual(len(GENERIC_MESSAGE.findall('\n'.join(msgs))), len(msgs))
 
 
     def test_format_expected_value_message(self):
@@ -53,12 +59,11 @@ class TestErrors(TestCase):
         'expected' [and 'got']
         '''
 
-        for func, param in product(funcs, params):
-            msg = build_error_message(func=func, param=param, expected='float')
-            self.assertRegex(msg, '^\w+ must be float \(at function \w+\)$')
+        msgs = [build_error_message(func=func, param=param, expected='float') for func, param in product(funcs, params)]
+        self.assertEqual(len(EXPECTED_VALUE_MESSAGE.findall('\n'.join(msgs))), len(msgs))
 
-            msg = build_error_message(func=func, param=param, expected='float', got='int')
-            self.assertRegex(msg, '^\w+ must be float but got int instead \(at function \w+\)$')
+        msgs = [build_error_message(func=func, param=param, expected='float', got='int') for func, param in product(funcs, params)]
+        self.assertEqual(len(EXPECTED_GOT_VALUE_MESSAGE.findall('\n'.join(msgs))), len(msgs))
 
 
 
@@ -82,5 +87,15 @@ class TestErrors(TestCase):
         self.assertRegex(msg, '^input is not valid')
 
 
+    def test_copy_error(self):
+        '''
+        Validation errors can be pickled and copied without losing its message
+        '''
+        error = ValidationError('foo', param='x', expected='float', got='int')
+        for other in (pickle.loads(pickle.dumps(error)), copy(error)):
+            self.assertEqual(str(other), str(error))
+            self.assertEqual(other.args, error.args)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,14 +1,13 @@
 
 import unittest
 from unittest import TestCase
-from validators import *
-from errors import *
+from validators import (AnyValidator, NoneValidator, TrueValidator, TypeValidator, UserValidator,
+    IteratorValidator, IterableValidator, CallableValidator, OptionalValidator)
 from config import Settings
-from itertools import *
-from inspect import *
+from inspect import signature
 from types import new_class
 from parser import parse_annotation as parse
-from typing import *
+from typing import Any, Iterator, Iterable, Callable, Optional
 import collections.abc
 
 
@@ -22,6 +21,8 @@ class TestParser(TestCase):
         '''
         self.assertIsInstance(parse(None), NoneValidator)
         self.assertIsInstance(parse(type(None)), NoneValidator)
+        self.assertIsInstance(parse([None]), NoneValidator)
+        self.assertIsInstance(parse([type(None)]), NoneValidator)
 
 
     def test_parse_any(self):
@@ -136,6 +137,22 @@ class TestParser(TestCase):
         self.assertIsInstance(parse(Optional[Iterable[int]]), OptionalValidator)
 
 
+    def test_parse_cache(self):
+        '''
+        Parsing the same (hashable) annotation with the same settings returns the same validator
+        '''
+        for type in types:
+            self.assertIs(parse(type), parse(type))
+        self.assertIs(parse(types), parse(list(types)))
+        self.assertIs(parse([int, float]), parse((float, int)))
+
+        self.assertIsNot(
+            parse(int, Settings(ignore_subclasses=True)),
+            parse(int, Settings(ignore_subclasses=False)))
+        self.assertIsInstance(parse(True), TrueValidator)
+        self.assertIsInstance(parse(1), AnyValidator)
+
+
 
 if __name__ == '__main__':
     unittest.main()
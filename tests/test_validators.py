@@ -1,40 +1,74 @@
 
 
 import unittest
+import weakref
+import gc
 from unittest import TestCase
-from collections.abc import *
-from validators import *
-from errors import *
-from itertools import *
-from inspect import *
-
-# Different random values of any kind of types
-values = [
+import collections.abc
+from collections.abc import Generator
+from validators import (Validator, AnyValidator, NoneValidator, TrueValidator, FalseValidator,
+    TypeValidator, UserValidator, IteratorValidator, IterableValidator, CallableValidator,
+    OptionalValidator)
+from errors import ValidationError
+from itertools import product, zip_longest
+
+# Different random values of any kind of types (shared by all the tests, they must
+# not be modified)
+values = (
     'foo', b'bar', 10, None, 1.5,
     [1, 2, 3], (1, 2, 3), set([4, 5, 6]), frozenset([7, 8, 9]),
     complex(1, 2), False, True, {'a':1, 'b':2, 'c':3},
     lambda x, y, z: (x, y, z), lambda x, *args, **kwargs: (x, args, kwargs),
     [], {}, ()
-]
+)
 
 # Set of random validators
-validators = [
+validators = (
     AnyValidator(), NoneValidator(),
     TypeValidator([int]), TypeValidator([bool]), TypeValidator([float, str]),
-    UserValidator(lambda x: isinstance(x, int) and x in range(0, 100))
-]
+    UserValidator(lambda x: isinstance(x, int) and 0 <= x < 100)
+)
+
+# All the combinations of validators and values
+PAIRS = tuple(product(validators, values))
+
+# Validators for the items of each non empty iterable value (indexed by the id of the value)
+item_validators = {
+    id(value): TypeValidator({type(item) for item in value})
+    for value in values if isinstance(value, collections.abc.Iterable) and value
+}
 
 class TestValidators(TestCase):
     '''
     Set of tests to check validators
     '''
-    def test_call_return_value(self):
+    def assertSameItems(self, a, b):
+        '''
+        Checks that both iterables return the same items (without storing them)
         '''
-        Check that all validator instances return a boolean value, None or a
-        generator when calling to its __call__ method
+        missing = object()
+        for x, y in zip_longest(a, b, fillvalue=missing):
+            self.assertEqual(x, y)
+
+    def test_return_values(self):
+        '''
+        For every validator and value:
+        - __call__ returns a boolean value, None or a generator
+        - test() returns always False or True
+        - test() returns False when validate() raises an exception with the same
+        input argument, and True otherwise
         '''
-        for validator, value in product(validators, values):
-            self.assertIsInstance(validator(value), (bool, Generator, type(None)))
+        for validator, value in PAIRS:
+            with self.subTest(validator=validator, value=value):
+                self.assertIsInstance(validator(value), (bool, Generator, type(None)))
+
+                valid = validator.test(value)
+                self.assertIsInstance(valid, bool)
+                try:
+                    validator.validate(value)
+                    self.assertTrue(valid)
+                except ValidationError:
+                    self.assertFalse(valid)
 
 
     def test_call_return_value_None(self):
@@ -152,40 +186,39 @@ class TestValidators(TestCase):
             self.assertIs(result, value)
 
 
-        for validator, value in product(validators, values):
-            try:
-                result = validator.validate(value)
-                if value is not result:
-                    for cls in collections.abc:
-                        if not isclass(cls) or not isinstance(value, cls):
-                            continue
-                        self.assertIsInstance(result, cls)
-
-            except ValidationError:
-                pass
+        # Validators that return proxies (the proxy implements the interface checked)
+        for value in values:
+            if isinstance(value, collections.abc.Iterable):
+                cases = (
+                    (IteratorValidator([AnyValidator()]), iter(value), collections.abc.Iterator),
+                    (IterableValidator([AnyValidator()]), value, collections.abc.Iterable)
+                )
+                for validator, item, cls in cases:
+                    result = validator.validate(item)
+                    self.assertIsNot(result, item)
+                    self.assertIsInstance(result, cls)
 
+        func = lambda x, y, z: (x, y, z)
+        result = CallableValidator([AnyValidator()] * 4).validate(func)
+        self.assertIsNot(result, func)
+        self.assertIsInstance(result, collections.abc.Callable)
 
-    def test_test_return_bool(self):
-        '''
-        Method test() on Validator class always return False or True values
-        '''
-        for validator, value in product(validators, values):
-            self.assertIsInstance(validator.test(value), bool)
 
-
-    def test_test_return_value(self):
+    def test_validate_all(self):
         '''
-        Method test() always return False when validate() raises an exception
-        with the same input argument. Also returns True if validate() dont raise
-        an exception
+        validate_all() returns the same values as calling validate() on each of them,
+        or raises an exception if any of them is not valid
         '''
-        for validator, value in product(validators, values):
-            try:
-                validator.validate(value)
-                self.assertTrue(validator.test(value))
-            except ValidationError:
-                self.assertFalse(validator.test(value))
-
+        for validator in validators:
+            for items in ([], values, [value for value in values if validator.test(value)]):
+                try:
+                    expected = [validator.validate(item) for item in items]
+                except ValidationError:
+                    self.assertRaises(ValidationError, validator.validate_all, items)
+                else:
+                    self.assertEqual(validator.validate_all(items), tuple(expected))
+                    # Any iterable is accepted (not only sequences)
+                    self.assertEqual(validator.validate_all(iter(items)), tuple(expected))
 
 
     def test_context(self):
@@ -230,6 +263,9 @@ class TestValidators(TestCase):
         except ValidationError:
             self.fail('AnyValidator must match any kind of argument value')
 
+        # AnyValidator has no state, only one instance is created
+        self.assertIs(AnyValidator(), validator)
+
 
     def test_none_validator(self):
         '''
@@ -255,9 +291,7 @@ class TestValidators(TestCase):
         Test TrueValidator (truth value testing validator)
         '''
         validator = TrueValidator()
-
-        for value in values:
-            self.assertEqual(validator.test(value), bool(value))
+        self.assertEqual(list(map(validator.test, values)), list(map(bool, values)))
 
 
     def test_false_validator(self):
@@ -265,30 +299,30 @@ class TestValidators(TestCase):
         Test FalseValidator (false value testing validator)
         '''
         validator = FalseValidator()
-
-        for value in values:
-            self.assertEqual(validator.test(value), not bool(value))
+        self.assertEqual(list(map(validator.test, values)), [not value for value in values])
 
 
     def test_type_validator(self):
         '''
         Check TypeValidator works properly
         '''
+        all_types = frozenset([type(value) for value in values])
+
+        # Validators for each type (with and without subclasses check)
+        exact_validators = {t: TypeValidator([t], check_subclasses=False) for t in all_types}
+        subclass_validators = {t: TypeValidator([t], check_subclasses=True) for t in all_types}
+
         for a in values:
             try:
-                TypeValidator([type(a)], check_subclasses=False).validate(a)
-                TypeValidator([type(a)], check_subclasses=True).validate(a)
+                exact_validators[type(a)].validate(a)
+                subclass_validators[type(a)].validate(a)
             except ValidationError:
                 self.fail()
 
             for b in values:
                 if type(a) != type(b):
-                    self.assertRaises(
-                        ValidationError,
-                        TypeValidator([type(a)], check_subclasses=False).validate,
-                        b)
+                    self.assertRaises(ValidationError, exact_validators[type(a)].validate, b)
 
-        all_types = frozenset([type(value) for value in values])
         for value in values:
             try:
                 TypeValidator(all_types, check_subclasses=False).validate(value)
@@ -310,6 +344,14 @@ class TestValidators(TestCase):
 
         self.assertRaises(ValidationError, TypeValidator([Foo], check_subclasses=False).validate, Bar())
 
+        # TypeValidator can be subclassed
+        class IntValidator(TypeValidator):
+            def __init__(self):
+                super().__init__([int], check_subclasses=False)
+
+        self.assertTrue(IntValidator().test(1))
+        self.assertFalse(IntValidator().test(True))
+
 
 
     def test_type_validator_compatible_classes(self):
@@ -322,6 +364,20 @@ class TestValidators(TestCase):
                     if validator.test(value):
                         self.assertIsInstance(validator.validate(value), cls)
 
+        # Cast methods set on the value itself are also used
+        class Foo:
+            pass
+        foo = Foo()
+        validator = TypeValidator([int], check_compatible_classes=True)
+        self.assertFalse(validator.test(foo))
+        foo.__int__ = lambda: 1
+        self.assertEqual(validator.validate(foo), 1)
+
+        # Types are not kept alive by the cast cache
+        ref = weakref.ref(Foo)
+        del Foo, foo
+        gc.collect()
+        self.assertIsNone(ref())
 
 
 
@@ -357,18 +413,23 @@ class TestValidators(TestCase):
                 proxy = validator.validate(iter(value))
 
                 self.assertIsInstance(proxy, collections.abc.Iterator)
-                self.assertEqual(list(proxy), list(value))
+                self.assertSameItems(proxy, value)
 
-                if len(tuple(value)) > 0:
-                    validator = IteratorValidator([TypeValidator(map(type, value))])
+                if value:
+                    validator = IteratorValidator([item_validators[id(value)]])
                     proxy = validator.validate(iter(value))
 
                     self.assertIsInstance(proxy, collections.abc.Iterator)
-                    self.assertEqual(list(proxy), list(value))
+                    self.assertSameItems(proxy, value)
 
         validator = IteratorValidator([TypeValidator([int])])
         self.assertRaises(ValidationError, validator.validate, [1, 2, 3.4])
 
+        # Only the iterator interface is exposed by the proxy (items cant be taken
+        # bypassing validation)
+        proxy = validator.validate(x for x in [1.5, 2])
+        self.assertRaises(AttributeError, getattr, proxy, 'send')
+
 
     def test_iterable_validator(self):
         '''
@@ -382,15 +443,22 @@ class TestValidators(TestCase):
 
                 self.assertIs(proxy, value)
 
-                if len(tuple(value)) > 0:
-                    validator = IterableValidator([TypeValidator(map(type, value))])
+                if value:
+                    validator = IterableValidator([item_validators[id(value)]])
                     proxy = validator.validate(value)
 
                     self.assertIsInstance(proxy, collections.abc.Iterable)
-                    self.assertEqual(list(proxy), list(value))
+                    self.assertSameItems(proxy, value)
             else:
                 self.assertRaises(ValidationError, IterableValidator().validate, value)
 
+        # Classes registered on the ABC after being checked are also valid
+        class Foo:
+            pass
+        self.assertFalse(IterableValidator().test(Foo()))
+        collections.abc.Iterable.register(Foo)
+        self.assertTrue(IterableValidator().test(Foo()))
+
 
     def test_callable_validator(self):
         '''
@@ -427,13 +495,21 @@ class TestValidators(TestCase):
         proxy = validator.validate(lambda x, y: True)
         self.assertRaises(ValidationError, proxy, None, None)
 
+        # Proxies have the same metadata as the wrapped callable
+        def foo(x, y):
+            '''foo docstring'''
+        proxy = validator.validate(foo)
+        self.assertEqual(proxy.__doc__, foo.__doc__)
+        self.assertEqual(proxy.__module__, foo.__module__)
+        self.assertEqual(proxy.__name__, foo.__name__)
+
 
     def test_optional_validator(self):
         '''
         Test for OptionalValidator class
         '''
 
-        for validator, value in product(validators, values):
+        for validator, value in PAIRS:
             v = OptionalValidator([validator])
 
             if value is None or validator.test(value):
@@ -3,7 +3,15 @@
 Helper functions for general purpose on this library
 '''
 
-from functools import update_wrapper, partial
+
+def _ordinal(k):
+    if k % 100 in (11, 12, 13):
+        return '{}th'.format(k)
+    return '{}{}'.format(k, {1: 'st', 2: 'nd', 3: 'rd'}.get(k % 10, 'th'))
+
+
+# Ordinals of the first numbers (the ones that are used most of the time) are precomputed
+_ordinals = tuple(_ordinal(k) for k in range(1, 32))
 
 
 def ordinal(k):
@@ -11,10 +19,6 @@ def ordinal(k):
     Return ordinal number abbreviation for the cardinal number k
     :param k: Must be an integer greater than 0
     '''
-    assert isinstance(k, int) and k > 0
-
-    if k == 1:
-        return '1st'
-    if k == 2:
-        return '2nd'
-    return '{}th'.format(k)
+    if 0 < k <= len(_ordinals):
+        return _ordinals[k-1]
+    return _ordinal(k)
@@ -2,9 +2,10 @@
 
 from typing import *
 import collections.abc
-from inspect import signature, Parameter
-from itertools import count, islice
+from inspect import signature, Parameter, isclass
+from itertools import islice, repeat
 from functools import update_wrapper
+from weakref import WeakKeyDictionary
 from operator import attrgetter
 from errors import ValidationError
 from utils import ordinal
@@ -16,6 +17,7 @@ class Validator:
     '''
     Base class for all validators
     '''
+    __slots__ = ()
 
     def __call__(self):
         raise NotImplementedError()
@@ -35,14 +37,14 @@ class Validator:
 
     def test(self, value):
         result = self(value)
-        if result is not None and not isinstance(result, (bool, collections.abc.Generator)):
-            raise TypeError('Validator.__call__ should return None, bool or generator')
-
-        if result is None:
+        # Validators returning booleans or None dont go through the generator protocol
+        if result is True or result is None:
             return True
+        if result is False:
+            return False
 
-        if isinstance(result, bool):
-            return result
+        if not isinstance(result, collections.abc.Generator):
+            raise TypeError('Validator.__call__ should return None, bool or generator')
 
         try:
             valid = next(result)
@@ -59,59 +61,74 @@ class Validator:
 
     def validate(self, value, context={}):
         result = self(value)
-        if result is not None and not isinstance(result, (bool, collections.abc.Generator)):
-            raise TypeError('Validator.__call__ should return None, bool or generator')
-
-        if isinstance(result, bool) or result is None:
-            # Returned boolean or None (None is the same as True)
-            if result is None:
-                result = True
-            valid = result
-            if not valid:
-                raise self.error(value, **context)
+        # Returned boolean or None (None is the same as True). This is checked first
+        # so that the most common case doesnt go through the generator protocol
+        if result is True or result is None:
             # Argument ok
             return value
+        if result is False:
+            raise self.error(value, **context)
 
-        if isinstance(result, collections.abc.Generator):
-            # Returned a generator
-            try:
-                # First item is boolean
-                valid = next(result)
-                if not isinstance(valid, bool):
-                    raise TypeError('Validator.__call__ generator must always return first a bool value')
+        if not isinstance(result, collections.abc.Generator):
+            raise TypeError('Validator.__call__ should return None, bool or generator')
 
-            except StopIteration as e:
-                assert e.value is None or isinstance(e.value, bool)
-                valid = e.value if e.value is not None else True
+        # Returned a generator
+        try:
+            # First item is boolean
+            valid = next(result)
+            if not isinstance(valid, bool):
+                raise TypeError('Validator.__call__ generator must always return first a bool value')
 
-            if not valid:
-                try:
-                    # Let validator trigger error with custom message
-                    result.send(context)
-                    # Throw error with default message
-                    raise self.error(value, **context)
-                except StopIteration:
-                    # Throw error with default message
-                    raise self.error(value, **context)
-
-            # Argument is ok
+        except StopIteration as e:
+            assert e.value is None or isinstance(e.value, bool)
+            valid = e.value if e.value is not None else True
+
+        if not valid:
             try:
-                # Get proxy
-                proxy = result.send(context)
-                # Replace value with proxy
-                value = proxy
+                # Let validator trigger error with custom message
+                result.send(context)
+                # Throw error with default message
+                raise self.error(value, **context)
             except StopIteration:
-                # No proxy returned
-                pass
+                # Throw error with default message
+                raise self.error(value, **context)
 
-            return value
+        # Argument is ok
+        try:
+            # Get proxy
+            proxy = result.send(context)
+            # Replace value with proxy
+            value = proxy
+        except StopIteration:
+            # No proxy returned
+            pass
+
+        return value
+
+
+    def validate_all(self, values, context={}):
+        '''
+        Validates all the given values (e.g. the items of *args) with the same context.
+        Returns a tuple with the result of validating each of them
+        Subclasses can override this to validate all the values at once
+        '''
+        return tuple(self.validate(value, context) for value in values)
 
 
 
 class AnyValidator(Validator):
     '''
     Type of validator that matches any value
+    There is only one instance of this class (it has no state)
     '''
+    __slots__ = ()
+
+    def __new__(cls):
+        self = cls.__dict__.get('_instance')
+        if self is None:
+            self = super().__new__(cls)
+            cls._instance = self
+        return self
 
     def __call__(self, value):
         # All values are ok
@@ -126,6 +143,7 @@ class NoneValidator(Validator):
     '''
     Kind of validator which only accepts the None value.
     '''
+    __slots__ = ()
 
     def __call__(self, value):
         # Only None value is ok
@@ -146,6 +164,8 @@ class TrueValidator(Validator):
     '''
     This validator matches any object that is evaluated to True in an if statemnt
     '''
+    __slots__ = ()
+
     def __call__(self, value):
         return bool(value)
 
@@ -158,6 +178,8 @@ class FalseValidator(Validator):
     '''
     This validator matches any object that is evaluated to False in an if statemnt
     '''
+    __slots__ = ()
+
     def __call__(self, value):
         return not bool(value)
 
@@ -167,10 +189,23 @@ class FalseValidator(Validator):
 
 
 
+# Methods that make an object compatible with (can be casted to) each builtin class
+CAST_METHODS = {
+    '__int__': int,
+    '__trunc__': int,
+    '__bool__': bool,
+    '__str__': str,
+    '__float__': float,
+    '__complex__': complex,
+    '__bytes__': bytes
+}
+
+
 class TypeValidator(Validator):
     '''
     Validator that checks if the given input argument has the expected type
     '''
+    __slots__ = ('types', 'type_set', 'check_subclasses', 'check_compatible_classes', 'casts', '_niddle')
 
     def __init__(self, types: Iterable[Type], check_subclasses: bool=True, check_compatible_classes: bool=False):
         '''
@@ -186,53 +221,89 @@ class TypeValidator(Validator):
 
         super().__init__()
         self.types = tuple(types)
+        self.type_set = types
         self.check_subclasses = check_subclasses
         self.check_compatible_classes = check_compatible_classes
+        # Cast method found for each type of value (see make_cast()). Types are weak
+        # referenced, validators are shared and classes created at runtime must be freed
+        self.casts = WeakKeyDictionary()
+
+        types = self.types
+        if len(types) == 1:
+            self._niddle = types[0].__name__
+        else:
+            self._niddle = ', '.join(map(attrgetter('__name__'), types[:-1])) + ' or ' + types[-1].__name__
 
 
     def __call__(self, value):
         if self.check_subclasses:
             valid = isinstance(value, self.types)
         else:
-            value_type = type(value)
-            valid = any(map(lambda t: value_type == t, self.types))
+            valid = type(value) in self.type_set
 
         if not valid and self.check_compatible_classes:
             return self.make_cast(value)
         return valid
 
 
-    def make_cast(self, value):
-        methods = {
-            '__int__': int,
-            '__trunc__': int,
-            '__bool__': bool,
-            '__str__': str,
-            '__float__': float,
-            '__complex__': complex,
-            '__bytes__': bytes
-        }
-        for attr, cls in methods.items():
-            if cls in self.types and hasattr(value, attr):
-                if type(value) == complex and cls in (float, int):
+    def validate(self, value, context={}):
+        # Fast path: values of the expected types are returned as they are, without
+        # calling __call__
+        if self.check_subclasses:
+            if isinstance(value, self.types):
+                return value
+        elif type(value) in self.type_set:
+            return value
+        return super().validate(value, context)
+
+
+    def validate_all(self, values, context={}):
+        # If no cast is needed, check the types of all the values in a single pass
+        # (values are iterated only once, so they can be any iterable)
+        values = tuple(values)
+        if self.check_subclasses and all(map(isinstance, values, repeat(self.types))):
+            return values
+        return super().validate_all(values, context)
+
+
+    def find_cast(self, obj):
+        '''
+        Returns the name of the method used to cast the given value (or values of the given
+        type) to any of the types of this validator (or None if they cant be casted)
+        '''
+        value_type = obj if isclass(obj) else type(obj)
+        for attr, cls in CAST_METHODS.items():
+            if cls in self.types and hasattr(obj, attr):
+                if value_type == complex and cls in (float, int):
                     # No conversion from complex to int or float (even if complex
                     # defines __int__ and __float__)
                     continue
+                return attr
+        return None
+
+
+    def make_cast(self, value):
+        # The cast method only depends on the type of the value
+        casts, value_type = self.casts, type(value)
+        try:
+            attr = casts[value_type]
+        except KeyError:
+            attr = casts[value_type] = self.find_cast(value_type)
+        if attr is None:
+            # Cast methods can also be set on the value itself
+            attr = self.find_cast(value)
+            if attr is None:
+                return False
 
-                yield True
-                cast_value = getattr(value, attr)
-                casted_value = cast_value()
-                yield casted_value
-                return
-        return False
+        yield True
+        cast_value = getattr(value, attr)
+        casted_value = cast_value()
+        yield casted_value
 
 
     @property
     def niddle(self):
-        types = self.types
-        if len(types) == 1:
-            return types[0].__name__
-        return ', '.join(map(attrgetter('__name__'), types[:-1])) + ' or ' + types[-1].__name__
+        return self._niddle
 
 
     def error(self, value, **kwargs):
@@ -246,6 +317,7 @@ class UserValidator(Validator):
     '''
     Instances of this class can be used to define user custom validators
     '''
+    __slots__ = ('func',)
 
     def __init__(self, func : Callable):
         '''
@@ -276,6 +348,8 @@ class TreeValidator(Validator):
     Base class for IteratorValidator, IterableValidator, and more...
     Represents a node in a tree structure (where each node its also a validator)
     '''
+    __slots__ = ('children', '_niddle')
+
     def __init__(self, children: Iterable[Validator]=[]):
         self.children = list(children)
 
@@ -283,6 +357,21 @@ class TreeValidator(Validator):
     def num_children(self):
         return len(self.children)
 
+    @property
+    def niddle(self):
+        # Its built only once (it depends on the niddle of all the children)
+        try:
+            return self._niddle
+        except AttributeError:
+            self._niddle = self.make_niddle()
+            return self._niddle
+
+    def make_niddle(self):
+        '''
+        Must be implemented by subclasses to build the niddle of the validator
+        '''
+        raise NotImplementedError()
+
 
 
 
@@ -292,20 +381,28 @@ class ProxyMixin:
         self.validator, self.context = validator, context
 
 
+# Details of the error raised when an invalid item is found while iterating (it
+# takes the type name of the item)
+ITERATION_ERROR_DETAILS = '{} value found while iterating'.format
+
+
 class IteratorProxy(collections.abc.Iterator, Wrapper, ProxyMixin):
     def __init__(self, target, *args, **kwargs):
         ProxyMixin.__init__(self, *args, **kwargs)
         Wrapper.__init__(self, target)
-        assert self.validator.num_children == 1 and isinstance(self.wrapped, collections.abc.Iterator)
+        # The validator already checked that the target is an iterator
+        assert self.validator.num_children == 1
+        self.validate_item = self.validator.children[0].validate
 
     def __next__(self):
-        item = next(self.wrapped)
+        obj = self.obj
+        item = next(obj)
         try:
-            return self.validator.children[0].validate(item)
+            return self.validate_item(item)
         except ValidationError:
             raise self.validator.error(
-                self.wrapped,
-                details='{} value found while iterating'.format(type(item).__name__ if item is not None else None),
+                obj,
+                details=ITERATION_ERROR_DETAILS(type(item).__name__ if item is not None else None),
                 **self.context
             )
 
@@ -314,16 +411,27 @@ class IterableProxy(collections.abc.Iterable, Wrapper, ProxyMixin):
     def __init__(self, target, *args, **kwargs):
         ProxyMixin.__init__(self, *args, **kwargs)
         Wrapper.__init__(self, target)
-        assert self.validator.num_children == 1 and isinstance(self.wrapped, collections.abc.Iterable)
+        # The validator already checked that the target is an iterable
+        assert self.validator.num_children == 1
 
     def __iter__(self):
-        return IteratorProxy(iter(self.wrapped), self.validator, self.context)
+        validator = self.validator
+        validate = validator.children[0].validate
+        for item in self.obj:
+            try:
+                item = validate(item)
+            except ValidationError:
+                raise validator.error(
+                    self.obj,
+                    details=ITERATION_ERROR_DETAILS(type(item).__name__ if item is not None else None),
+                    **self.context
+                )
+            yield item
 
 
 
 class CallableProxy(collections.abc.Callable, CallableWrapper, ProxyMixin):
     def __init__(self, target, *args, **kwargs):
-        assert callable(target)
         ProxyMixin.__init__(self, *args, **kwargs)
         CallableWrapper.__init__(self, target)
 
@@ -333,61 +441,110 @@ class CallableProxy(collections.abc.Callable, CallableWrapper, ProxyMixin):
             # No signature avaliable
             self.sig = None
 
-    def __call__(self, *args, **kwargs):
-        # Variables used to format error messages
-        func, param = self.context.get('func', '?'), self.context.get('param', '?')
+        # Number of parameters if all of them are positional (None otherwise). In that case
+        # positional only calls with the right number of args dont need to be bound
+        self.num_positional = None
+        if self.sig is not None and all(param.kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+                                        for param in self.sig.parameters.values()):
+            self.num_positional = len(self.sig.parameters)
+
+        # Arguments that must be validated: (index, validator) for each of them (the ones
+        # that match any value are skipped)
+        self.arg_checks = [
+            (k, validator) for k, validator in enumerate(self.validator.children[:-1])
+            if type(validator) is not AnyValidator
+        ]
+
+        # Validator for the return value (None if it matches any value)
+        self.result_validator = self.validator.children[-1]
+        if type(self.result_validator) is AnyValidator:
+            self.result_validator = None
 
+    def __call__(self, *args, **kwargs):
+        # Attributes are read only once (they are used many times)
+        sig, obj = self.sig, self.obj
 
-        if self.sig is not None:
+        if sig is not None:
             # Callable signature avaliable
 
-            # Bound arguments to the callable signature
-            bounded_args = self.sig.bind(*args, **kwargs)
-            bounded_args.apply_defaults()
-            args = list(bounded_args.args)
+            if kwargs or len(args) != self.num_positional:
+                # Bound arguments to the callable signature
+                bounded_args = sig.bind(*args, **kwargs)
+                bounded_args.apply_defaults()
+                args = bounded_args.args
 
-            param_validators = self.validator.children[:-1]
-            if len(args) != len(param_validators):
+            num_validators = self.validator.num_children - 1
+            if len(args) != num_validators:
                 # Incorrect number of args
                 raise ValidationError(
-                    message='{} expects {} arguments but got {} instead'.format(param, len(args), len(param_validators)),
-                    func=func
+                    message='{} expects {} arguments but got {} instead'.format(
+                        self.context.get('param', '?'), len(args), num_validators),
+                    func=self.context.get('func', '?')
                 )
 
             # Validate each argument
-            for k, arg, validator in zip(count(), args, param_validators):
+            for k, validator in self.arg_checks:
                 try:
-                    args[k] = validator.validate(arg, context={'func': func, 'param': '{} argument of {}'.format(ordinal(k+1), param)})
+                    arg = args[k]
+                    # The context is only needed by validators that may return proxies
+                    if isinstance(validator, TreeValidator):
+                        value = validator.validate(arg, context=self.arg_context(k))
+                    else:
+                        value = validator.validate(arg)
+                    if value is not arg:
+                        # The argument was replaced (e.g. by a proxy). Args are copied
+                        # only when this happens
+                        if not isinstance(args, list):
+                            args = list(args)
+                        args[k] = value
                 except ValidationError:
                     raise ValidationError(
-                        message='{} argument passed to {} must be {}'.format(ordinal(k+1), param, validator.niddle),
-                        func=func
+                        message='{} argument passed to {} must be {}'.format(
+                            ordinal(k+1), self.context.get('param', '?'), validator.niddle),
+                        func=self.context.get('func', '?')
                     )
 
             # Invoke the callable
-            result = CallableWrapper.__call__(self, *args)
+            result = obj(*args)
         else:
             # Callable signature not avaliable
-            result = CallableWrapper.__call__(self, *args, **kwargs)
+            result = obj(*args, **kwargs)
 
         # Validate the result
-        context = {'func': func, 'param': 'return value of {}'.format(param)}
-        validator = self.validator.children[-1]
+        validator = self.result_validator
+        if validator is None:
+            return result
         try:
-            result = validator.validate(result, context=context)
+            if isinstance(validator, TreeValidator):
+                result = validator.validate(result, context=self.result_context())
+            else:
+                result = validator.validate(result)
         except ValidationError:
-            raise ValidationError(expected=validator.niddle, **context)
+            raise ValidationError(expected=validator.niddle, **self.result_context())
 
         # Finally return the result of the callable
         return result
 
 
+    # Context dicts passed to the validators of the arguments & the return value
+
+    def arg_context(self, k):
+        return {'func': self.context.get('func', '?'),
+                'param': '{} argument of {}'.format(ordinal(k+1), self.context.get('param', '?'))}
+
+    def result_context(self):
+        return {'func': self.context.get('func', '?'),
+                'param': 'return value of {}'.format(self.context.get('param', '?'))}
+
+
 
 
 class IteratorValidator(TreeValidator):
     '''
     Validator that checks the given argument is an iterator
     '''
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         assert self.num_children <= 1
@@ -404,8 +561,21 @@ class IteratorValidator(TreeValidator):
             yield IteratorProxy(value, self, context)
 
 
-    @property
-    def niddle(self):
+    # test() and validate() do the same as __call__ without driving a generator
+
+    def test(self, value):
+        return isinstance(value, collections.abc.Iterator)
+
+
+    def validate(self, value, context={}):
+        if not isinstance(value, collections.abc.Iterator):
+            raise self.error(value, **context)
+        if self.num_children != 0:
+            return IteratorProxy(value, self, context)
+        return value
+
+
+    def make_niddle(self):
         return 'iterator' + ('' if self.num_children == 0 else ' of ' + self.children[0].niddle)
 
 
@@ -414,6 +584,8 @@ class IterableValidator(TreeValidator):
     '''
     Validator that checks if the given argument is an iterable
     '''
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         assert self.num_children <= 1
@@ -430,8 +602,21 @@ class IterableValidator(TreeValidator):
             yield IterableProxy(value, self, context)
 
 
-    @property
-    def niddle(self):
+    # test() and validate() do the same as __call__ without driving a generator
+
+    def test(self, value):
+        return isinstance(value, collections.abc.Iterable)
+
+
+    def validate(self, value, context={}):
+        if not isinstance(value, collections.abc.Iterable):
+            raise self.error(value, **context)
+        if self.num_children != 0:
+            return IterableProxy(value, self, context)
+        return value
+
+
+    def make_niddle(self):
         return 'iterable' + ('' if self.num_children == 0 else ' of ' + self.children[0].niddle)
 
 
@@ -440,6 +625,8 @@ class CallableValidator(TreeValidator):
     '''
     Validator that checks if the given argument is a callable object of some kind
     '''
+    __slots__ = ()
+
     def __call__(self, value):
         if not callable(value):
             # Not a callable object
@@ -465,8 +652,7 @@ class CallableValidator(TreeValidator):
         if self.num_children != 0:
             yield CallableProxy(value, self, context)
 
-    @property
-    def niddle(self):
+    def make_niddle(self):
         if self.num_children == 0:
             return 'callable'
         return 'callable({})->{}'.format(', '.join(map(attrgetter('niddle'), self.children[:-1])), self.children[-1].niddle)
@@ -478,6 +664,8 @@ class OptionalValidator(TreeValidator):
     Creates a validator that checks if the input argument either satisifies some
     condition or is set to None
     '''
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         assert self.num_children == 1
@@ -497,6 +685,5 @@ class OptionalValidator(TreeValidator):
         yield opt_validator.validate(value, context)
 
 
-    @property
-    def niddle(self):
+    def make_niddle(self):
         return self.children[0].niddle + ' or None'
@@ -2,8 +2,7 @@
 from typing import *
 from inspect import signature
 from errors import ValidationError
-from itertools import count
-from functools import lru_cache, partial, update_wrapper
+from functools import cached_property, update_wrapper
 import inspect
 from inspect import Parameter, Signature
 import types
@@ -61,6 +60,19 @@ class CallableWrapper(Wrapper):
 
 
 
+class SourceCode:
+    '''
+    Its a piece of python source code. Its representation is the code itself
+    (used to generate source code from inspect.Signature objects)
+    '''
+    def __init__(self, code):
+        self.code = code
+
+    def __repr__(self):
+        return self.code
+
+
+
 class ValidateFuncWrapper(CallableWrapper):
     '''
     An object of this class is a wrapper to a given function but it incorporates
@@ -75,47 +87,22 @@ class ValidateFuncWrapper(CallableWrapper):
         '''
         super().__init__(func)
         self.options = options
+        self.validated_call = None
 
+        # Signature of the wrapped function
+        self.signature = inspect.signature(func)
 
-    @property
-    @lru_cache(maxsize=1)
-    def signature(self):
-        '''
-        Returns the signature of the wrapped function
-        '''
-        return inspect.signature(self)
-
-
-    @property
-    @lru_cache(maxsize=1)
-    def varargs_param(self):
-        '''
-        Return the parameter (instance of class inspect.Parameter)
-        in the signature of the wrapped function which is of type *args
-        or None if *args is not in the signature
-        '''
+        # Parameters (instances of the class inspect.Parameter) of type *args and **kwargs
+        # in the signature of the wrapped function (None if they are not in the signature)
+        self.varargs_param, self.varkwargs_param = None, None
         for param in self.signature.parameters.values():
             if param.kind == Parameter.VAR_POSITIONAL:
-                return param
-        return None
+                self.varargs_param = param
+            elif param.kind == Parameter.VAR_KEYWORD:
+                self.varkwargs_param = param
 
 
-    @property
-    @lru_cache(maxsize=1)
-    def varkwargs_param(self):
-        '''
-        Return the parameter (instance of class inspect.Parameter)
-        in the signature of the wrapped function which is of type **kwargs
-        or None if **kwargs is not in the signature
-        '''
-        for param in self.signature.parameters.values():
-            if param.kind == Parameter.VAR_KEYWORD:
-                return param
-        return None
-
-
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def param_validators(self):
         '''
         Returns a list of validators (on for each parameter in the wrapped function signature),
@@ -134,8 +121,7 @@ class ValidateFuncWrapper(CallableWrapper):
         return dict(zip(signature.parameters.keys(), validators))
 
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def return_validator(self):
         '''
         Returns the validator that will be used to validate the return value
@@ -149,74 +135,113 @@ class ValidateFuncWrapper(CallableWrapper):
             )
 
 
-    def bind(self, *args, **kwargs):
-        '''
-        Binds the given arguments to the signature of the wrapped function
-        (also applies default values)
-        '''
-        bounded = self.signature.bind(*args, **kwargs)
-        bounded.apply_defaults()
-        return bounded
-
-
-    def validate_input(self, *args, **kwargs):
+    def compile(self):
         '''
-        Validates the given input arguments.
-        Returns a tuple with the values args and kwargs which are the positional and
-        keyword arguments that should be passed when calling to the wrapped function
+        Generates and compiles the source code of a function with the same signature as
+        the wrapped one, which validates the input arguments, calls the wrapped function
+        and validates its return value.
+        Everything that doesnt depend on the arguments passed (validators, context dicts,
+        options...) is resolved here, so the generated code only contains the validation calls
+        needed for this function
+        e.g: For the function "def foo(x : int, *args : float) -> str: ..."
+        this method generates something like:
+
+        def foo(x, *args):
+            x = _v_x(x, _c_x)
+            args = _v_args(args, _c_args)
+            return _v_return(_func(x, *args), _c_return)
+
+        Validators, contexts and default values are passed to the generated code as
+        closure variables (faster to access than globals or attributes)
+
+        If there is nothing to validate, the wrapped function itself is returned
         '''
-        if not self.options['match_args']:
-            # Dont validate input arguments
-            return args, kwargs
-
-        bounded = self.bind(*args, **kwargs)
+        from validators import AnyValidator
 
-        args = []
-        varargs = []
-        varkwargs = {}
-
-        for key, value in bounded.arguments.items():
-            param = self.signature.parameters[key]
-
-            if param.kind == Parameter.VAR_KEYWORD:
+        signature = self.signature
+        options = self.options
+        param_validators = self.param_validators
+        func_name = self.__name__
+
+        # Parameters with validators that match any value (e.g. not annotated) are passed
+        # as they are, without invoking the validator
+        def must_validate(validator):
+            return type(validator) is not AnyValidator
+
+        # All the variables used by the generated code start with a prefix which is
+        # not used by any parameter of the function (so they cant be shadowed)
+        prefix = '_checked_'
+        while any(name.startswith(prefix) for name in signature.parameters.keys()):
+            prefix += '_'
+
+        namespace = {prefix + 'func': self.obj}
+        params, body, args, kwargs = [], [], [], []
+
+        for k, param in enumerate(signature.parameters.values()):
+            name, kind = param.name, param.kind
+            validator, context = prefix + 'v{}'.format(k), prefix + 'c{}'.format(k)
+
+            # Default values are referenced by name in the generated signature
+            if param.default is not Parameter.empty:
+                default = prefix + 'd{}'.format(k)
+                namespace[default] = param.default
+                param = param.replace(default=SourceCode(default))
+            params.append(param.replace(annotation=Parameter.empty))
+
+            if kind == Parameter.VAR_POSITIONAL:
+                # *args
+                args.append('*' + name)
+                if options['match_args'] and options['match_varargs'] and must_validate(param_validators[name]):
+                    namespace[validator] = param_validators[name].validate_all
+                    namespace[context] = {'func': func_name, 'param': 'items on *{}'.format(name)}
+                    body.append('{name} = {v}({name}, {c})'.format(
+                        name=name, v=validator, c=context))
+
+            elif kind == Parameter.VAR_KEYWORD:
                 # **kwargs
-                if key in self.param_validators and self.options['match_varkwargs']:
-                    validate = partial(self.param_validators[key].validate, context={'func': self.__name__, 'param': 'values on **{}'.format(key)})
-                    varkwargs.update(zip(value.keys(), map(validate, value.values())))
-                else:
-                    varkwargs.update(value)
+                kwargs.append('**' + name)
+                if options['match_args'] and options['match_varkwargs'] and must_validate(param_validators[name]):
+                    namespace[validator] = param_validators[name].validate
+                    namespace[context] = {'func': func_name, 'param': 'values on **{}'.format(name)}
+                    body.append('{name} = {{{p}key: {v}({p}value, {c}) for {p}key, {p}value in {name}.items()}}'.format(
+                        name=name, v=validator, c=context, p=prefix))
 
-            elif param.kind == Parameter.VAR_POSITIONAL:
-                # *args
-                if key in self.param_validators and self.options['match_varargs']:
-                    validate = partial(self.param_validators[key].validate, context={'func': self.__name__, 'param': 'items on *{}'.format(key)})
-                    varargs.extend(map(validate, value))
-                else:
-                    # *args items will not be validated
-                    varargs.extend(value)
             else:
                 # Regular argument
-                validate = partial(self.param_validators[key].validate, context={'func': self.__name__, 'param': key})
-                args.append(validate(value))
-
-        args += varargs
-        return args, varkwargs
-
-
-
-    def validate_output(self, output):
-        '''
-        Validates the return value (the output of the wrapped function).
-        The value returned by this method will be used as the output of the call to
-        this wrapper function
-        '''
-        if not self.options['match_return']:
-            # Dont validate output
-            return output
-
-        return self.return_validator.validate(
-            output,
-            context={'func': self.__name__, 'param': 'return value'})
+                if kind == Parameter.KEYWORD_ONLY:
+                    kwargs.append('{0}={0}'.format(name))
+                else:
+                    args.append(name)
+                if options['match_args'] and must_validate(param_validators[name]):
+                    namespace[validator] = param_validators[name].validate
+                    namespace[context] = {'func': func_name, 'param': name}
+                    body.append('{name} = {v}({name}, {c})'.format(
+                        name=name, v=validator, c=context))
+
+        result = '{}func({})'.format(prefix, ', '.join(args + kwargs))
+        if options['match_return'] and must_validate(self.return_validator):
+            namespace[prefix + 'vr'] = self.return_validator.validate
+            namespace[prefix + 'cr'] = {'func': func_name, 'param': 'return value'}
+            result = '{p}vr({}, {p}cr)'.format(result, p=prefix)
+        elif not body:
+            # Nothing to validate, the wrapped function can be called directly
+            return self.obj
+        body.append('return ' + result)
+
+        # The function is defined inside another one which receives the variables in
+        # the namespace as arguments. Its name also uses the prefix, so that it cant be
+        # shadowed by any of the variables (__name__ is set afterwards)
+        name = prefix + 'wrapper'
+        source = 'def {}create({}):\n    def {}{}:\n        {}\n    return {}\n'.format(
+            prefix, ', '.join(namespace.keys()),
+            name, Signature(params), '\n        '.join(body),
+            name)
+
+        code = {}
+        exec(compile(source, '<checked {}>'.format(func_name), 'exec'), code)
+        func = code[prefix + 'create'](**namespace)
+        func.__name__, func.__qualname__ = func_name, self.__qualname__
+        return func
 
 
     def __get__(self, obj, objtype):
@@ -231,7 +256,7 @@ class ValidateFuncWrapper(CallableWrapper):
                         expected='instance of the class {}'.format(objtype.__name__),
                         got=type(obj).__name__ if obj is not None else str(None))
 
-                return super().__call__(obj, *args, **kwargs)
+                return self.obj(obj, *args, **kwargs)
 
         if obj is None:
             return MethodWrapper(self)
@@ -239,7 +264,8 @@ class ValidateFuncWrapper(CallableWrapper):
 
 
     def __call__(self, *args, **kwargs):
-        args, kwargs = self.validate_input(*args, **kwargs)
-        result = super().__call__(*args, **kwargs)
-        result = self.validate_output(result)
-        return result
+        # The validation function is generated the first time the wrapper is called
+        call = self.validated_call
+        if call is None:
+            call = self.validated_call = self.compile()
+        return call(*args, **kwargs)